@@ -1,9 +1,13 @@
 from flask import Flask, render_template, request, redirect, url_for, session, flash, send_file, jsonify
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, joinedload
 from werkzeug.security import generate_password_hash, check_password_hash
-from werkzeug.utils import secure_filename
+from werkzeug.utils import secure_filename, safe_join
 import os
-from datetime import datetime
+import sqlite3
+from datetime import datetime, timedelta
 import pandas as pd
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
@@ -17,29 +21,126 @@ import openpyxl
 from PIL import Image as PILImage
 import docx2txt
 import base64
+import hashlib
+from PIL import ImageOps
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import click
+import queue
+import atexit
+import gzip
+import json
+import mimetypes
+import tempfile
+from contextlib import closing, contextmanager
+from urllib.parse import quote
 
 # Import docx in a way that Pylance accepts
 try:
     import docx
     from docx.api import Document  # type: ignore
+    from docx.shared import Inches  # type: ignore
 except ImportError:
     try:
         from docx import Document  # type: ignore
+        from docx.shared import Inches  # type: ignore
     except ImportError:
         Document = None
+        Inches = None
         print("Warning: python-docx not available. Word export will not work.")
 
+# gunicorn is only needed for the production `serve` command
+try:
+    from gunicorn.app.base import BaseApplication  # type: ignore
+except ImportError:
+    BaseApplication = None
+
+# pyarrow is only needed for Parquet catalog exports
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.parquet as pq  # type: ignore
+except ImportError:
+    pa = None
+    pq = None
+
+# boto3 is only needed for the S3 storage backend
+try:
+    import boto3  # type: ignore
+    from boto3.s3.transfer import TransferConfig  # type: ignore
+    from botocore.config import Config as BotoConfig  # type: ignore
+    from botocore.exceptions import ClientError  # type: ignore
+except ImportError:
+    boto3 = None
+
+# brotli is optional; responses fall back to gzip without it
+try:
+    import brotli  # type: ignore
+except ImportError:
+    brotli = None
+
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-here-change-in-production'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///database.db'
-app.config['UPLOAD_FOLDER'] = 'uploads'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///database.db')
+app.config['UPLOAD_FOLDER'] = os.environ.get('UPLOAD_FOLDER', 'uploads')
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
+# File storage: 'local' (UPLOAD_FOLDER on this machine) or 's3' (any S3-compatible
+# service such as MinIO, shared by every app node)
+app.config['STORAGE_BACKEND'] = os.environ.get('STORAGE_BACKEND', 'local')
+app.config['S3_BUCKET'] = os.environ.get('S3_BUCKET', 'webdokumentasi')
+app.config['S3_ENDPOINT_URL'] = os.environ.get('S3_ENDPOINT_URL')  # e.g. http://localhost:9000 for MinIO
+app.config['S3_ACCESS_KEY'] = os.environ.get('S3_ACCESS_KEY')
+app.config['S3_SECRET_KEY'] = os.environ.get('S3_SECRET_KEY')
+app.config['S3_REGION'] = os.environ.get('S3_REGION', 'us-east-1')
+app.config['S3_PRESIGN_EXPIRES'] = 300  # seconds a download link stays valid
+app.config['S3_MULTIPART_THRESHOLD'] = 8 * 1024 * 1024
+app.config['S3_MULTIPART_CHUNKSIZE'] = 8 * 1024 * 1024
+# Image derivatives (downscaled copies embedded in PDF/Word exports)
+# Kept on local disk even with S3 storage, so it is a per-node cache
+app.config['DERIVATIVE_FOLDER'] = os.environ.get(
+    'DERIVATIVE_FOLDER', os.path.join(app.config['UPLOAD_FOLDER'], '.derivatives')
+)
+app.config['DERIVATIVE_CACHE_MAX_BYTES'] = 512 * 1024 * 1024  # least recently used are pruned beyond this
+app.config['IMAGE_EXPORT_DPI'] = 150
+app.config['IMAGE_EXPORT_QUALITY'] = 85
+# Dashboard
+app.config['DOCS_PER_PAGE'] = 30
+# Activity log (written in batches by a background thread)
+app.config['ACTIVITY_FLUSH_INTERVAL'] = 2  # seconds
+app.config['ACTIVITY_BATCH_SIZE'] = 500
+app.config['ACTIVITY_QUEUE_SIZE'] = 10000
+# Response compression
+app.config['COMPRESS_MIN_SIZE'] = 500  # bytes
+app.config['COMPRESS_LEVEL'] = 6
+app.config['COMPRESS_MIMETYPES'] = {
+    'text/html', 'text/css', 'text/plain', 'text/javascript',
+    'application/json', 'application/javascript',
+}
+# Catalog export
+app.config['EXPORT_CHUNK_SIZE'] = 50000  # rows read from the database at a time
+# Fingerprinted static assets built by `flask --app app build-assets`
+app.config['ASSET_FOLDER'] = os.path.join('static', 'dist')
 
 db = SQLAlchemy(app)
 
 # Allowed file extensions
 ALLOWED_EXTENSIONS = {'pdf', 'doc', 'docx', 'xls', 'xlsx', 'jpg', 'jpeg', 'png'}
 
+# Download extension when a document is "converted" to its own format
+ORIGINAL_DOWNLOAD_EXTENSIONS = {'pdf': 'pdf', 'excel': 'xlsx', 'word': 'docx'}
+
+# Document type for each allowed extension (used when importing files in bulk)
+EXTENSION_DOC_TYPES = {
+    'pdf': 'pdf',
+    'doc': 'word',
+    'docx': 'word',
+    'xls': 'excel',
+    'xlsx': 'excel',
+    'jpg': 'image',
+    'jpeg': 'image',
+    'png': 'image',
+}
+
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
@@ -52,9 +153,105 @@ class Documentation(db.Model):
     title = db.Column(db.String(200), nullable=False)
     content = db.Column(db.Text)
     file_path = db.Column(db.String(300))
-    doc_type = db.Column(db.String(50), nullable=False)
+    doc_type = db.Column(db.String(50), nullable=False, index=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+
+class FacetGeneration(db.Model):
+    """Single-row counter bumped in the same transaction as every document change.
+
+    Each process keeps its dashboard facet counts until the committed value
+    moves on, so all workers see a write as soon as it is committed.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    value = db.Column(db.Integer, nullable=False, default=0)
+
+class ActivityLog(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    # Plain columns rather than foreign keys so entries outlive deleted documents
+    user_id = db.Column(db.Integer, nullable=True)
+    doc_id = db.Column(db.Integer, nullable=True)
+    action = db.Column(db.String(20), nullable=False)
+    detail = db.Column(db.String(200))
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    
+    __table_args__ = (
+        db.Index('ix_activity_log_doc_id_created_at', 'doc_id', 'created_at'),
+        db.Index('ix_activity_log_user_id_created_at', 'user_id', 'created_at'),
+    )
+
+# Query string arguments the dashboard filters on
+DASHBOARD_FILTER_KEYS = ('doc_type', 'author', 'date_from', 'date_to', 'mine', 'sort')
+
+@event.listens_for(Engine, 'connect')
+def enable_sqlite_wal(dbapi_connection, connection_record):
+    """Use WAL on SQLite so long reads (e.g. catalog exports) don't block writers"""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.close()
+
+# Dashboard sort options: name -> ORDER BY clauses
+DASHBOARD_SORTS = {
+    'oldest': (Documentation.created_at.asc(), Documentation.id.asc()),
+    'newest': (Documentation.created_at.desc(), Documentation.id.desc()),
+    'title': (Documentation.title.asc(), Documentation.id.asc()),
+    'type': (Documentation.doc_type.asc(), Documentation.created_at.desc()),
+}
+
+# Facet counts for the dashboard, cached per process for one FacetGeneration value
+_facet_cache = {'generation': None, 'facets': None}
+
+def bump_facet_generation(connection):
+    """Mark the facet counts stale; takes effect when the surrounding transaction commits"""
+    table = FacetGeneration.__table__
+    connection.execute(table.update().where(table.c.id == 1).values(value=table.c.value + 1))
+
+@event.listens_for(Session, 'after_flush')
+def bump_facet_generation_on_flush(session, flush_context):
+    changed = list(session.new) + list(session.dirty) + list(session.deleted)
+    if any(isinstance(obj, Documentation) for obj in changed):
+        bump_facet_generation(session.connection())
+
+def get_facet_counts():
+    """Return document counts per doc_type and per author from one grouped query"""
+    generation = db.session.query(FacetGeneration.value).filter(FacetGeneration.id == 1).scalar()
+    if generation is not None and generation == _facet_cache['generation']:
+        return _facet_cache['facets']
+    
+    rows = db.session.query(
+        Documentation.doc_type, User.id, User.username, func.count(Documentation.id)
+    ).join(User, Documentation.user_id == User.id).group_by(
+        Documentation.doc_type, User.id, User.username
+    ).all()
+    
+    doc_types = {}
+    authors = {}
+    total = 0
+    for doc_type, user_id, username, count in rows:
+        doc_types[doc_type] = doc_types.get(doc_type, 0) + count
+        author = authors.setdefault(user_id, {'id': user_id, 'username': username, 'count': 0})
+        author['count'] += count
+        total += count
+    
+    facets = {
+        'total': total,
+        'doc_types': sorted(doc_types.items()),
+        'authors': sorted(authors.values(), key=lambda a: a['username']),
+    }
+    _facet_cache['facets'] = facets
+    _facet_cache['generation'] = generation
+    return facets
+
+def parse_date_arg(name):
+    """Parse a YYYY-MM-DD query string argument, returning None if missing or invalid"""
+    value = request.args.get(name, '').strip()
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        return None
 
 def allowed_file(filename):
     if '.' not in filename:
@@ -77,14 +274,456 @@ def can_view(doc):
     # Both admin and users can view all documents
     return True
 
+class CountingReader:
+    """File-like wrapper that counts the bytes read through it"""
+    
+    def __init__(self, stream):
+        self.stream = stream
+        self.bytes_read = 0
+    
+    def read(self, size=-1):
+        data = self.stream.read(size)
+        self.bytes_read += len(data)
+        return data
+
+class LocalStorage:
+    """Uploaded files on the local filesystem.
+
+    Keys are paths relative to the working directory (e.g. uploads/report.pdf),
+    which is what Documentation.file_path has always stored.
+    """
+    
+    chunk_size = 1024 * 1024
+    
+    def ensure_ready(self):
+        os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    
+    def exists(self, key):
+        return os.path.exists(key)
+    
+    def open(self, key):
+        """Open a file for streaming reads"""
+        return open(key, 'rb')
+    
+    def save(self, key, stream, content_type=None):
+        """Stream a file into storage, returning the number of bytes written"""
+        os.makedirs(os.path.dirname(key) or '.', exist_ok=True)
+        # Write to a unique temporary name first so readers never see a partial
+        # file and concurrent uploads of the same name don't interleave
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(key) or '.', suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                shutil.copyfileobj(stream, f, self.chunk_size)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        # mkstemp() creates owner-only files; keep the usual upload permissions
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, key)
+        return os.path.getsize(key)
+    
+    def delete(self, key):
+        if os.path.exists(key):
+            os.remove(key)
+    
+    def list_names(self, folder):
+        """Return the file names stored directly under folder"""
+        if not os.path.isdir(folder):
+            return []
+        return os.listdir(folder)
+    
+    @contextmanager
+    def local_path(self, key):
+        """Yield a local filesystem path for libraries that need one"""
+        yield key
+    
+    def send(self, key, download_name, mimetype=None):
+        """Response that downloads the file as an attachment"""
+        return send_file(key, as_attachment=True, download_name=download_name, mimetype=mimetype)
+
+class S3Storage:
+    """Uploaded files in an S3-compatible bucket (AWS S3, MinIO, ...).
+
+    Uploads and downloads are streamed and switch to multipart transfers above
+    S3_MULTIPART_THRESHOLD. Downloads are served by redirecting the browser to
+    a presigned URL, so file bytes never pass through the app nodes.
+    """
+    
+    def __init__(self, bucket, endpoint_url=None, access_key=None, secret_key=None, region=None):
+        self.bucket = bucket
+        self.region = region
+        self.client = boto3.client(
+            's3',
+            endpoint_url=endpoint_url,
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key,
+            region_name=region,
+            config=BotoConfig(signature_version='s3v4', s3={'addressing_style': 'path'})
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=app.config['S3_MULTIPART_THRESHOLD'],
+            multipart_chunksize=app.config['S3_MULTIPART_CHUNKSIZE']
+        )
+    
+    def ensure_ready(self):
+        """Create the bucket if it does not exist yet"""
+        try:
+            self.client.head_bucket(Bucket=self.bucket)
+            return
+        except ClientError as e:
+            # Anything but "missing" (e.g. 403 on a bucket we can use but not
+            # list) is left for the actual reads and writes to report
+            if e.response.get('Error', {}).get('Code') not in ('404', 'NoSuchBucket', 'NotFound'):
+                return
+        kwargs = {'Bucket': self.bucket}
+        if self.region and self.region != 'us-east-1':
+            kwargs['CreateBucketConfiguration'] = {'LocationConstraint': self.region}
+        self.client.create_bucket(**kwargs)
+    
+    @staticmethod
+    def object_key(key):
+        return key.replace(os.sep, '/')
+    
+    def exists(self, key):
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.object_key(key))
+            return True
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
+    
+    def open(self, key):
+        """Open an object for streaming reads"""
+        response = self.client.get_object(Bucket=self.bucket, Key=self.object_key(key))
+        return closing(response['Body'])
+    
+    def save(self, key, stream, content_type=None):
+        """Stream a file into the bucket, returning the number of bytes written"""
+        reader = CountingReader(stream)
+        extra_args = {'ContentType': content_type} if content_type else None
+        self.client.upload_fileobj(reader, self.bucket, self.object_key(key),
+                                   ExtraArgs=extra_args, Config=self.transfer_config)
+        return reader.bytes_read
+    
+    def delete(self, key):
+        self.client.delete_object(Bucket=self.bucket, Key=self.object_key(key))
+    
+    def list_names(self, folder):
+        """Return the object names stored directly under folder"""
+        prefix = self.object_key(folder).rstrip('/') + '/'
+        names = []
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix, Delimiter='/'):
+            names.extend(item['Key'][len(prefix):] for item in page.get('Contents', []))
+        return names
+    
+    @contextmanager
+    def local_path(self, key):
+        """Download the object to a temporary file for libraries that need a path"""
+        # Keep the original file name, the converters show it in their output
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_path = os.path.join(tmp_dir, os.path.basename(self.object_key(key)))
+            with open(tmp_path, 'wb') as f:
+                self.client.download_fileobj(self.bucket, self.object_key(key), f, Config=self.transfer_config)
+            yield tmp_path
+    
+    def send(self, key, download_name, mimetype=None):
+        """Redirect to a short-lived presigned URL that downloads the object"""
+        params = {
+            'Bucket': self.bucket,
+            'Key': self.object_key(key),
+            'ResponseContentDisposition': f"attachment; filename*=UTF-8''{quote(download_name)}",
+        }
+        if mimetype:
+            params['ResponseContentType'] = mimetype
+        url = self.client.generate_presigned_url(
+            'get_object', Params=params, ExpiresIn=app.config['S3_PRESIGN_EXPIRES']
+        )
+        return redirect(url)
+
+def delete_stored_file(file_path):
+    """Delete an uploaded file together with any cached image derivatives"""
+    storage = get_storage()
+    # Derivatives are keyed by content hash. Hashing a file in S3 would mean
+    # downloading it, so there the size limit on the cache cleans them up.
+    ext = file_path.rsplit('.', 1)[-1].lower()
+    if isinstance(storage, LocalStorage) and EXTENSION_DOC_TYPES.get(ext) == 'image':
+        remove_image_derivatives(file_path)
+    storage.delete(file_path)
+
+# Storage backend, created lazily per process (boto3 clients must not cross a fork)
+_storage = {'pid': None, 'backend': None}
+
+def get_storage():
+    """Return the configured storage backend"""
+    if _storage['pid'] != os.getpid():
+        backend = app.config['STORAGE_BACKEND']
+        if backend == 's3':
+            if boto3 is None:
+                raise RuntimeError("boto3 is not installed. Install it with: pip install boto3")
+            _storage['backend'] = S3Storage(
+                app.config['S3_BUCKET'],
+                endpoint_url=app.config['S3_ENDPOINT_URL'],
+                access_key=app.config['S3_ACCESS_KEY'],
+                secret_key=app.config['S3_SECRET_KEY'],
+                region=app.config['S3_REGION']
+            )
+        elif backend == 'local':
+            _storage['backend'] = LocalStorage()
+        else:
+            raise RuntimeError(f"Unknown STORAGE_BACKEND: {backend}")
+        _storage['pid'] = os.getpid()
+    return _storage['backend']
+
 def get_image_base64(file_path):
     """Convert image to base64 for display in HTML"""
     try:
-        with open(file_path, 'rb') as img_file:
+        with get_storage().open(file_path) as img_file:
             return base64.b64encode(img_file.read()).decode('utf-8')
     except Exception as e:
         return None
 
+# Cache of file content hashes keyed by (path, mtime, size)
+_content_hash_cache = {}
+
+def file_content_hash(file_path):
+    """Return the SHA-256 of a file, reusing the last result while it is unchanged"""
+    stat = os.stat(file_path)
+    key = (os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+    digest = _content_hash_cache.get(key)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        # Files downloaded from S3 land on a new temporary path every time,
+        # so keep the cache from growing without bound
+        if len(_content_hash_cache) >= 4096:
+            _content_hash_cache.clear()
+        _content_hash_cache[key] = digest
+    return digest
+
+def get_image_derivative(image_path, max_width_in, max_height_in, dpi=None, quality=None):
+    """Return (path, width_px, height_px) of a right-sized copy of an image.
+
+    The image is rotated according to its EXIF orientation, downscaled so it
+    fits max_width_in x max_height_in inches at the given DPI and re-encoded.
+    Derivatives are cached on disk by content hash, so repeated exports of the
+    same file skip decoding entirely.
+    """
+    dpi = dpi or app.config['IMAGE_EXPORT_DPI']
+    quality = quality or app.config['IMAGE_EXPORT_QUALITY']
+    max_px = (int(max_width_in * dpi), int(max_height_in * dpi))
+    
+    folder = app.config['DERIVATIVE_FOLDER']
+    digest = file_content_hash(image_path)
+    base = f"{digest}_{max_px[0]}x{max_px[1]}_q{quality}"
+    for ext in ('jpg', 'png'):
+        cached = os.path.join(folder, f"{base}.{ext}")
+        if os.path.exists(cached):
+            try:
+                # Mark as recently used so pruning keeps it
+                os.utime(cached)
+                with PILImage.open(cached) as img:
+                    return cached, img.size[0], img.size[1]
+            except FileNotFoundError:
+                # Pruned by another thread in the meantime; build it again
+                break
+    
+    os.makedirs(folder, exist_ok=True)
+    with PILImage.open(image_path) as img:
+        # draft() lets the JPEG decoder skip most of the work for large photos
+        img.draft('RGB', (max(max_px), max(max_px)))
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail(max_px, PILImage.LANCZOS)
+        
+        has_alpha = img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info)
+        out_path = os.path.join(folder, f"{base}.{'png' if has_alpha else 'jpg'}")
+        # Each writer gets its own temporary file, so concurrent exports of the
+        # same image never interleave before the atomic rename
+        fd, tmp_path = tempfile.mkstemp(dir=folder, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                if has_alpha:
+                    img.save(f, format='PNG', optimize=True)
+                else:
+                    img.convert('RGB').save(f, format='JPEG', quality=quality,
+                                            optimize=True, progressive=True, dpi=(dpi, dpi))
+            os.replace(tmp_path, out_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        size = img.size
+    
+    prune_image_derivatives(keep=out_path)
+    return out_path, size[0], size[1]
+
+def prune_image_derivatives(keep=None):
+    """Delete least recently used derivatives while the cache exceeds DERIVATIVE_CACHE_MAX_BYTES"""
+    folder = app.config['DERIVATIVE_FOLDER']
+    entries = []
+    total = 0
+    try:
+        with os.scandir(folder) as it:
+            for entry in it:
+                if entry.is_file() and entry.name.endswith(('.jpg', '.png')):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+    except FileNotFoundError:
+        return
+    
+    entries.sort()
+    for mtime, size, path in entries:
+        if total <= app.config['DERIVATIVE_CACHE_MAX_BYTES']:
+            break
+        if path == keep:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+def remove_image_derivatives(file_path):
+    """Delete the cached derivatives of an image that is being deleted or replaced"""
+    folder = app.config['DERIVATIVE_FOLDER']
+    if not os.path.isdir(folder):
+        return
+    try:
+        digest = file_content_hash(file_path)
+    except OSError:
+        return
+    for name in os.listdir(folder):
+        if name.startswith(f"{digest}_"):
+            try:
+                os.remove(os.path.join(folder, name))
+            except FileNotFoundError:
+                pass
+
+class ActivityWriter:
+    """Write-behind activity log.
+
+    Requests only put entries on an in-process queue; a background thread
+    inserts them in batched transactions every ACTIVITY_FLUSH_INTERVAL seconds
+    (or as soon as a full batch is waiting) and flushes what is left at exit.
+    The thread is started lazily so each forked worker process gets its own.
+    """
+    
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=app.config['ACTIVITY_QUEUE_SIZE'])
+        self.thread = None
+        self.pid = None
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+        self.dropped_lock = threading.Lock()
+        self.dropped = 0  # total entries dropped because the queue was full
+        self.dropped_reported = 0
+    
+    def log(self, action, doc_id=None, detail=None, user_id=None):
+        self.ensure_started()
+        entry = {
+            'user_id': user_id,
+            'doc_id': doc_id,
+            'action': action,
+            'detail': detail[:200] if detail else detail,
+            'created_at': datetime.utcnow(),
+        }
+        try:
+            self.queue.put_nowait(entry)
+        except queue.Full:
+            # Never block a request on the audit trail, but count what is lost
+            with self.dropped_lock:
+                self.dropped += 1
+    
+    def report_dropped(self):
+        """Warn about entries dropped since the last report"""
+        with self.dropped_lock:
+            new_drops = self.dropped - self.dropped_reported
+            self.dropped_reported = self.dropped
+        if new_drops:
+            print(f"Warning: activity log queue full, dropped {new_drops} entries "
+                  f"({self.dropped} since start)")
+    
+    def ensure_started(self):
+        if self.pid == os.getpid() and self.thread is not None:
+            return
+        with self.lock:
+            if self.pid == os.getpid() and self.thread is not None:
+                return
+            if self.pid is not None:
+                # Forked child: the parent's queue contents and thread are not ours
+                self.queue = queue.Queue(maxsize=app.config['ACTIVITY_QUEUE_SIZE'])
+            self.pid = os.getpid()
+            self.stopping.clear()
+            self.thread = threading.Thread(target=self.run, name='activity-writer', daemon=True)
+            self.thread.start()
+    
+    def run(self):
+        interval = app.config['ACTIVITY_FLUSH_INTERVAL']
+        batch_size = app.config['ACTIVITY_BATCH_SIZE']
+        while not self.stopping.is_set():
+            deadline = time.monotonic() + interval
+            batch = []
+            while len(batch) < batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0 or self.stopping.is_set():
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            self.write(batch)
+            self.report_dropped()
+    
+    def drain(self):
+        batch = []
+        while True:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                return batch
+    
+    def write(self, batch):
+        if not batch:
+            return
+        try:
+            with app.app_context():
+                with db.engine.begin() as connection:
+                    connection.execute(ActivityLog.__table__.insert(), batch)
+        except Exception as e:
+            print(f"Warning: failed to write {len(batch)} activity log entries: {e}")
+    
+    def flush(self):
+        """Stop the writer thread and write everything still queued"""
+        if self.thread is None or self.pid != os.getpid():
+            return
+        self.stopping.set()
+        self.thread.join(timeout=app.config['ACTIVITY_FLUSH_INTERVAL'] + 5)
+        self.thread = None
+        self.write(self.drain())
+        self.report_dropped()
+
+activity_writer = ActivityWriter()
+atexit.register(activity_writer.flush)
+
+def log_activity(action, doc_id=None, detail=None):
+    """Record an action by the current user on the activity log"""
+    activity_writer.log(action, doc_id=doc_id, detail=detail, user_id=session.get('user_id'))
+
+def get_activity(doc_id=None, user_id=None, limit=100):
+    """Return the most recent activity log entries for a document and/or user"""
+    query = ActivityLog.query
+    if doc_id is not None:
+        query = query.filter(ActivityLog.doc_id == doc_id)
+    if user_id is not None:
+        query = query.filter(ActivityLog.user_id == user_id)
+    return query.order_by(ActivityLog.created_at.desc(), ActivityLog.id.desc()).limit(limit).all()
+
 def pdf_to_excel(pdf_path, title):
     """Convert PDF to Excel while preserving structure"""
     try:
@@ -178,8 +817,12 @@ def image_to_pdf(image_path, title):
         story.append(title_para)
         story.append(Spacer(1, 12))
         
-        # Add image
-        img = ReportLabImage(image_path, width=400, height=300)
+        # Add image, downscaled to fit the page frame and keeping its aspect ratio
+        max_width = doc.width
+        max_height = doc.height - 72  # leave room for the title
+        derivative, px_width, px_height = get_image_derivative(image_path, max_width / 72, max_height / 72)
+        scale = min(max_width / px_width, max_height / px_height)
+        img = ReportLabImage(derivative, width=px_width * scale, height=px_height * scale)
         story.append(img)
         
         doc.build(story)
@@ -229,6 +872,13 @@ def image_to_word(image_path, title):
         doc = Document()
         doc.add_heading(title, 0)
         
+        # Add image, downscaled to fit the page width
+        derivative, px_width, px_height = get_image_derivative(image_path, 6, 8)
+        if px_width / px_height >= 6 / 8:
+            doc.add_picture(derivative, width=Inches(6))
+        else:
+            doc.add_picture(derivative, height=Inches(8))
+        
         # Add image information
         with PILImage.open(image_path) as img:
             doc.add_paragraph(f"Image Information:")
@@ -486,6 +1136,115 @@ def manual_to_word(content, title):
     except Exception as e:
         return create_fallback_word(title, f"Error processing manual content: {str(e)}")
 
+def catalog_query():
+    """Documentation joined with its author, one row per document"""
+    return select(
+        Documentation.id,
+        Documentation.title,
+        Documentation.doc_type,
+        Documentation.file_path,
+        func.length(Documentation.content).label('content_length'),
+        Documentation.created_at,
+        Documentation.user_id,
+        User.username.label('author'),
+    ).join(User, Documentation.user_id == User.id).order_by(Documentation.id)
+
+CATALOG_COLUMNS = ['id', 'title', 'doc_type', 'file_path', 'content_length', 'created_at', 'user_id', 'author']
+
+EXPORT_FORMATS = {'csv', 'parquet'}
+
+def combine_counts(counts, keys):
+    """Sum per-chunk group-by counts into one DataFrame of keys + count"""
+    if not counts:
+        return pd.DataFrame(columns=keys + ['count'])
+    combined = pd.concat(counts).groupby(level=list(range(len(keys)))).sum()
+    return combined.rename_axis(keys).reset_index(name='count')
+
+def catalog_parquet_schema():
+    return pa.schema([
+        ('id', pa.int64()),
+        ('title', pa.string()),
+        ('doc_type', pa.string()),
+        ('file_path', pa.string()),
+        ('content_length', pa.int64()),
+        ('created_at', pa.timestamp('us')),
+        ('user_id', pa.int64()),
+        ('author', pa.string()),
+    ])
+
+def write_catalog_export(zip_path, file_format):
+    """Write the document catalog and its stats to a ZIP archive.
+
+    The catalog is read in EXPORT_CHUNK_SIZE chunks and each chunk is appended
+    to the output as it arrives, so memory stays bounded however large the
+    table is. Counts per type, author and month are accumulated with pandas
+    group-bys on each chunk. The read transaction stays open for the whole
+    export; SQLite runs in WAL mode (see enable_sqlite_wal) so writers are not
+    blocked meanwhile.
+    """
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {file_format}")
+    if file_format == 'parquet' and pq is None:
+        raise RuntimeError("pyarrow is not installed. Install it with: pip install pyarrow")
+    
+    type_counts = []
+    author_counts = []
+    month_counts = []
+    total = 0
+    
+    with tempfile.TemporaryDirectory() as tmp_dir, \
+            zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        catalog_path = os.path.join(tmp_dir, f"catalog.{file_format}")
+        writer = pq.ParquetWriter(catalog_path, catalog_parquet_schema()) if file_format == 'parquet' else None
+        
+        with db.engine.connect() as connection:
+            chunks = pd.read_sql(
+                catalog_query(),
+                connection.execution_options(stream_results=True),
+                chunksize=app.config['EXPORT_CHUNK_SIZE'],
+                parse_dates=['created_at']
+            )
+            for chunk in chunks:
+                chunk['content_length'] = chunk['content_length'].astype('Int64')
+                total += len(chunk)
+                
+                # Per-chunk counts are small (one row per key), so they are
+                # kept and summed once at the end
+                type_counts.append(chunk.groupby('doc_type').size())
+                author_counts.append(chunk.groupby(['user_id', 'author']).size())
+                month_counts.append(chunk.groupby(chunk['created_at'].dt.strftime('%Y-%m')).size())
+                
+                if writer is not None:
+                    writer.write_table(pa.Table.from_pandas(chunk, schema=catalog_parquet_schema(),
+                                                            preserve_index=False))
+                else:
+                    chunk.to_csv(catalog_path, mode='a', header=not os.path.exists(catalog_path), index=False)
+        
+        if writer is not None:
+            writer.close()
+        elif not os.path.exists(catalog_path):
+            # Empty catalog: still write the header row
+            pd.DataFrame(columns=CATALOG_COLUMNS).to_csv(catalog_path, index=False)
+        
+        # Parquet is already compressed
+        compress_type = zipfile.ZIP_STORED if file_format == 'parquet' else zipfile.ZIP_DEFLATED
+        archive.write(catalog_path, f"catalog.{file_format}", compress_type=compress_type)
+        
+        stats = {
+            'stats_by_type': combine_counts(type_counts, ['doc_type']),
+            'stats_by_author': combine_counts(author_counts, ['user_id', 'author']),
+            'stats_by_month': combine_counts(month_counts, ['month']),
+        }
+        for name, frame in stats.items():
+            if file_format == 'parquet':
+                buffer = io.BytesIO()
+                frame.to_parquet(buffer, index=False)
+                archive.writestr(f"{name}.parquet", buffer.getvalue())
+            else:
+                archive.writestr(f"{name}.csv", frame.to_csv(index=False))
+    
+    return total
+
 def create_fallback_pdf(title, message):
     """Create a fallback PDF when conversion fails"""
     buffer = io.BytesIO()
@@ -523,6 +1282,105 @@ def create_fallback_word(title, message):
     buffer.seek(0)
     return buffer
 
+def accepted_encodings():
+    """Return the compressed encodings the client accepts, best first"""
+    accepted = request.accept_encodings
+    encodings = []
+    if brotli is not None and accepted['br']:
+        encodings.append('br')
+    if accepted['gzip']:
+        encodings.append('gzip')
+    return encodings
+
+@app.after_request
+def compress_response(response):
+    """Compress HTML/JSON responses for clients that accept it"""
+    # Files from send_file (PDF, XLSX, ...) are passed through untouched
+    if (response.direct_passthrough or response.is_streamed
+            or response.status_code < 200 or response.status_code >= 300
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in app.config['COMPRESS_MIMETYPES']):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < app.config['COMPRESS_MIN_SIZE']:
+        return response
+    
+    encodings = accepted_encodings()
+    if not encodings:
+        return response
+    if encodings[0] == 'br':
+        compressed = brotli.compress(data, quality=4)
+    else:
+        compressed = gzip.compress(data, compresslevel=app.config['COMPRESS_LEVEL'])
+    
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encodings[0]
+    return response
+
+# Asset manifest: source name -> fingerprinted name, reloaded when a new build replaces it
+_asset_manifest = {'mtime': None, 'assets': {}}
+
+def get_asset_manifest():
+    manifest_path = os.path.join(app.config['ASSET_FOLDER'], 'manifest.json')
+    try:
+        mtime = os.stat(manifest_path).st_mtime_ns
+    except OSError:
+        return {}
+    if mtime != _asset_manifest['mtime']:
+        try:
+            with open(manifest_path) as f:
+                _asset_manifest['assets'] = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        _asset_manifest['mtime'] = mtime
+    return _asset_manifest['assets']
+
+@app.context_processor
+def inject_asset_url():
+    assets = get_asset_manifest()
+    
+    def asset_url(filename):
+        if filename in assets:
+            return url_for('asset', filename=assets[filename])
+        # Assets have not been built: use the plain static file, versioned by
+        # its modification time so browsers pick up edits
+        try:
+            version = int(os.path.getmtime(os.path.join(app.static_folder, filename)))
+        except OSError:
+            return url_for('static', filename=filename)
+        return url_for('static', filename=filename, v=version)
+    
+    return {'asset_url': asset_url}
+
+@app.route('/assets/<path:filename>')
+def asset(filename):
+    """Serve a fingerprinted static asset, precompressed when possible"""
+    # Any build's files are served, not just the current manifest's, so pages
+    # rendered before a rebuild keep working
+    folder = os.path.abspath(app.config['ASSET_FOLDER'])
+    path = safe_join(folder, filename)
+    if path is None or filename == 'manifest.json' or not os.path.isfile(path):
+        return 'Not Found', 404
+    
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    encoding = None
+    for candidate in accepted_encodings():
+        suffix = '.br' if candidate == 'br' else '.gz'
+        if os.path.exists(path + suffix):
+            path = path + suffix
+            encoding = candidate
+            break
+    
+    response = send_file(path, mimetype=mimetype)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    # The name changes whenever the content does, so it can be cached forever
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
 @app.route('/')
 def index():
     if 'user_id' not in session:
@@ -559,24 +1417,64 @@ def dashboard():
     if 'user_id' not in session:
         return redirect(url_for('login'))
     
-    # Both admin and users can see ALL documents
-    docs = Documentation.query.all()
+    # Both admin and users can see ALL documents, narrowed by the filters
+    filters = {
+        'doc_type': request.args.get('doc_type', '').strip(),
+        'author': request.args.get('author', type=int),
+        'date_from': request.args.get('date_from', '').strip(),
+        'date_to': request.args.get('date_to', '').strip(),
+        'mine': request.args.get('mine') == '1',
+        'sort': request.args.get('sort', 'oldest'),
+    }
+    if filters['sort'] not in DASHBOARD_SORTS:
+        filters['sort'] = 'oldest'
+    
+    query = Documentation.query.options(joinedload(Documentation.author))
+    if filters['doc_type']:
+        query = query.filter(Documentation.doc_type == filters['doc_type'])
+    if filters['mine']:
+        query = query.filter(Documentation.user_id == session['user_id'])
+    elif filters['author']:
+        query = query.filter(Documentation.user_id == filters['author'])
+    date_from = parse_date_arg('date_from')
+    if date_from:
+        query = query.filter(Documentation.created_at >= date_from)
+    date_to = parse_date_arg('date_to')
+    if date_to:
+        # The end date is inclusive
+        query = query.filter(Documentation.created_at < date_to + timedelta(days=1))
+    query = query.order_by(*DASHBOARD_SORTS[filters['sort']])
+    
+    pagination = query.paginate(
+        page=request.args.get('page', 1, type=int),
+        per_page=app.config['DOCS_PER_PAGE'],
+        error_out=False
+    )
     
     # Prepare documents with additional data for display
     docs_with_content = []
-    for doc in docs:
+    for doc in pagination.items:
         doc_data = {
             'doc': doc,
             'image_preview': None
         }
         
         # If it's an image, get base64 for preview
-        if doc.doc_type == 'image' and doc.file_path and os.path.exists(doc.file_path):
+        if doc.doc_type == 'image' and doc.file_path:
             doc_data['image_preview'] = get_image_base64(doc.file_path)
         
         docs_with_content.append(doc_data)
     
-    return render_template('dashboard.html', docs=docs_with_content)
+    # Query string for pagination links; only the known filters are passed on so
+    # url_for() options such as _external or _anchor can't be injected
+    filter_args = {key: request.args[key] for key in DASHBOARD_FILTER_KEYS if request.args.get(key)}
+    
+    return render_template('dashboard.html',
+                         docs=docs_with_content,
+                         pagination=pagination,
+                         filters=filters,
+                         filter_args=filter_args,
+                         facets=get_facet_counts())
 
 @app.route('/add_doc', methods=['GET', 'POST'])
 def add_doc():
@@ -594,7 +1492,7 @@ def add_doc():
             if allowed_file(file.filename):
                 filename = secure_filename(file.filename)
                 file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                file.save(file_path)
+                get_storage().save(file_path, file.stream, content_type=file.mimetype)
             else:
                 flash('File type not allowed. Allowed types: PDF, Word, Excel, Images', 'error')
                 return redirect(url_for('add_doc'))
@@ -636,18 +1534,20 @@ def edit_doc(doc_id):
         if file and file.filename:
             if allowed_file(file.filename):
                 # Delete old file if exists
-                if doc.file_path and os.path.exists(doc.file_path):
-                    os.remove(doc.file_path)
+                if doc.file_path:
+                    delete_stored_file(doc.file_path)
                 
                 # Save new file
                 filename = secure_filename(file.filename)
                 doc.file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                file.save(doc.file_path)
+                get_storage().save(doc.file_path, file.stream, content_type=file.mimetype)
             else:
                 flash('File type not allowed. Allowed types: PDF, Word, Excel, Images', 'error')
                 return redirect(url_for('edit_doc', doc_id=doc_id))
         
+        title = doc.title
         db.session.commit()
+        log_activity('edit', doc_id=doc_id, detail=title)
         flash('Document updated successfully!', 'success')
         return redirect(url_for('dashboard'))
     
@@ -666,11 +1566,13 @@ def delete_doc(doc_id):
         return redirect(url_for('dashboard'))
     
     # Delete associated file
-    if doc.file_path and os.path.exists(doc.file_path):
-        os.remove(doc.file_path)
+    if doc.file_path:
+        delete_stored_file(doc.file_path)
     
+    title = doc.title
     db.session.delete(doc)
     db.session.commit()
+    log_activity('delete', doc_id=doc_id, detail=title)
     flash('Document deleted successfully!', 'success')
     return redirect(url_for('dashboard'))
 
@@ -689,9 +1591,10 @@ def view_doc(doc_id):
     # Prepare content for display
     image_preview = None
     
-    if doc.file_path and os.path.exists(doc.file_path) and doc.doc_type == 'image':
+    if doc.file_path and doc.doc_type == 'image':
         image_preview = get_image_base64(doc.file_path)
     
+    log_activity('view', doc_id=doc.id)
     return render_template('view_doc.html', 
                          doc=doc, 
                          image_preview=image_preview)
@@ -709,15 +1612,13 @@ def download_file(doc_id):
         flash('You do not have permission to download this file', 'error')
         return redirect(url_for('dashboard'))
     
-    if not doc.file_path or not os.path.exists(doc.file_path):
+    storage = get_storage()
+    if not doc.file_path or not storage.exists(doc.file_path):
         flash('File not found', 'error')
         return redirect(url_for('dashboard'))
     
-    return send_file(
-        doc.file_path,
-        as_attachment=True,
-        download_name=os.path.basename(doc.file_path)
-    )
+    log_activity('download', doc_id=doc.id)
+    return storage.send(doc.file_path, os.path.basename(doc.file_path))
 
 @app.route('/convert_doc/<int:doc_id>/<target_format>')
 def convert_doc(doc_id, target_format):
@@ -750,54 +1651,45 @@ def convert_doc(doc_id, target_format):
         
         # Handle file-based documents
         else:
-            if not doc.file_path or not os.path.exists(doc.file_path):
+            storage = get_storage()
+            if not doc.file_path or not storage.exists(doc.file_path):
                 flash('Original file not found', 'error')
                 return redirect(url_for('view_doc', doc_id=doc_id))
             
-            if original_type == 'pdf':
-                if target_format == 'excel':
-                    buffer = pdf_to_excel(doc.file_path, doc.title)
-                elif target_format == 'word':
-                    buffer = pdf_to_word(doc.file_path, doc.title)
-                elif target_format == 'pdf':
-                    # Same format, just download original
-                    return send_file(
-                        doc.file_path,
-                        as_attachment=True,
-                        download_name=f"{doc.title}.pdf"
-                    )
+            # Same format, just download original
+            if original_type == target_format and original_type in ORIGINAL_DOWNLOAD_EXTENSIONS:
+                log_activity('convert', doc_id=doc.id, detail=target_format)
+                return storage.send(
+                    doc.file_path,
+                    f"{doc.title}.{ORIGINAL_DOWNLOAD_EXTENSIONS[original_type]}"
+                )
             
-            elif original_type == 'image':
-                if target_format == 'pdf':
-                    buffer = image_to_pdf(doc.file_path, doc.title)
-                elif target_format == 'excel':
-                    buffer = image_to_excel(doc.file_path, doc.title)
-                elif target_format == 'word':
-                    buffer = image_to_word(doc.file_path, doc.title)
-            
-            elif original_type == 'excel':
-                if target_format == 'pdf':
-                    buffer = excel_to_pdf(doc.file_path, doc.title)
-                elif target_format == 'word':
-                    buffer = excel_to_word(doc.file_path, doc.title)
-                elif target_format == 'excel':
-                    return send_file(
-                        doc.file_path,
-                        as_attachment=True,
-                        download_name=f"{doc.title}.xlsx"
-                    )
-            
-            elif original_type == 'word':
-                if target_format == 'pdf':
-                    buffer = word_to_pdf(doc.file_path, doc.title)
-                elif target_format == 'excel':
-                    buffer = word_to_excel(doc.file_path, doc.title)
-                elif target_format == 'word':
-                    return send_file(
-                        doc.file_path,
-                        as_attachment=True,
-                        download_name=f"{doc.title}.docx"
-                    )
+            with storage.local_path(doc.file_path) as file_path:
+                if original_type == 'pdf':
+                    if target_format == 'excel':
+                        buffer = pdf_to_excel(file_path, doc.title)
+                    elif target_format == 'word':
+                        buffer = pdf_to_word(file_path, doc.title)
+                
+                elif original_type == 'image':
+                    if target_format == 'pdf':
+                        buffer = image_to_pdf(file_path, doc.title)
+                    elif target_format == 'excel':
+                        buffer = image_to_excel(file_path, doc.title)
+                    elif target_format == 'word':
+                        buffer = image_to_word(file_path, doc.title)
+                
+                elif original_type == 'excel':
+                    if target_format == 'pdf':
+                        buffer = excel_to_pdf(file_path, doc.title)
+                    elif target_format == 'word':
+                        buffer = excel_to_word(file_path, doc.title)
+                
+                elif original_type == 'word':
+                    if target_format == 'pdf':
+                        buffer = word_to_pdf(file_path, doc.title)
+                    elif target_format == 'excel':
+                        buffer = word_to_excel(file_path, doc.title)
         
         if buffer is None:
             flash(f'Conversion from {original_type} to {target_format} is not supported', 'error')
@@ -817,6 +1709,7 @@ def convert_doc(doc_id, target_format):
             filename = f"{doc.title}.{target_format}"
             mimetype = 'application/octet-stream'
         
+        log_activity('convert', doc_id=doc.id, detail=target_format)
         return send_file(
             buffer,
             as_attachment=True,
@@ -828,9 +1721,221 @@ def convert_doc(doc_id, target_format):
         flash(f'Error converting document: {str(e)}', 'error')
         return redirect(url_for('view_doc', doc_id=doc_id))
 
+@app.route('/activity')
+def activity():
+    """Activity log as JSON, filterable by doc_id and user_id - ONLY ADMIN"""
+    if 'user_id' not in session:
+        return redirect(url_for('login'))
+    
+    if session.get('role') != 'admin':
+        return jsonify({'error': 'You do not have permission to view the activity log'}), 403
+    
+    entries = get_activity(
+        doc_id=request.args.get('doc_id', type=int),
+        user_id=request.args.get('user_id', type=int),
+        limit=max(1, min(request.args.get('limit', 100, type=int), 1000))
+    )
+    response = jsonify([{
+        'id': entry.id,
+        'user_id': entry.user_id,
+        'doc_id': entry.doc_id,
+        'action': entry.action,
+        'detail': entry.detail,
+        'created_at': entry.created_at.isoformat(),
+    } for entry in entries])
+    # Entries this worker process lost because its queue was full
+    response.headers['X-Activity-Dropped'] = str(activity_writer.dropped)
+    return response
+
+def iter_import_sources(source, handles):
+    """Yield (name, opener) for every importable file in a directory or ZIP archive.
+
+    Archive handles opened by the worker threads are appended to handles; the
+    caller closes them once the workers are done.
+    """
+    if zipfile.is_zipfile(source):
+        local = threading.local()
+        lock = threading.Lock()
+        
+        def open_member(member):
+            # ZipFile objects are not safe to share between threads, so each
+            # worker keeps its own handle on the archive
+            if not hasattr(local, 'archive'):
+                local.archive = zipfile.ZipFile(source)
+                with lock:
+                    handles.append(local.archive)
+            return local.archive.open(member)
+        
+        with zipfile.ZipFile(source) as archive:
+            for info in archive.infolist():
+                # Skip folders and anything inside hidden folders, as os.walk does below
+                folders = info.filename.split('/')[:-1]
+                if info.is_dir() or any(part.startswith('.') for part in folders):
+                    continue
+                yield info.filename, (lambda member=info.filename: open_member(member))
+    else:
+        for root, dirs, files in os.walk(source):
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            for name in files:
+                path = os.path.join(root, name)
+                yield os.path.relpath(path, source), (lambda path=path: open(path, 'rb'))
+
+def copy_import_file(storage, opener, key):
+    """Copy one imported file into storage, returning the bytes written"""
+    with opener() as src:
+        return storage.save(key, src, content_type=mimetypes.guess_type(key)[0])
+
+@app.cli.command('import-docs')
+@click.argument('source', type=click.Path(exists=True))
+@click.option('--username', default='admin', show_default=True, help='Owner of the imported documents.')
+@click.option('--workers', type=click.IntRange(min=1), default=8, show_default=True,
+              help='Number of parallel copy workers.')
+@click.option('--batch-size', type=click.IntRange(min=1), default=1000, show_default=True,
+              help='Rows inserted per transaction.')
+def import_docs(source, username, workers, batch_size):
+    """Bulk import every allowed file from a directory or ZIP archive"""
+    user = User.query.filter_by(username=username).first()
+    if user is None:
+        raise click.ClickException(f"User '{username}' not found")
+    
+    storage = get_storage()
+    upload_folder = app.config['UPLOAD_FOLDER']
+    taken = set(storage.list_names(upload_folder))
+    
+    def reserve_filename(name):
+        # Files with the same name in different folders must not overwrite each other
+        filename = secure_filename(os.path.basename(name)) or 'file'
+        stem, ext = os.path.splitext(filename)
+        counter = 1
+        while filename in taken:
+            filename = f"{stem}_{counter}{ext}"
+            counter += 1
+        taken.add(filename)
+        return filename
+    
+    stats = {'imported': 0, 'hidden': 0, 'unsupported': 0, 'failed': 0, 'bytes': 0}
+    start = time.perf_counter()
+    
+    def flush(pool, batch):
+        futures = [(entry, pool.submit(copy_import_file, storage, entry['opener'], entry['file_path'])) for entry in batch]
+        rows = []
+        for entry, future in futures:
+            try:
+                stats['bytes'] += future.result()
+            except Exception as e:
+                stats['failed'] += 1
+                click.echo(f"Failed to import {entry['name']}: {e}", err=True)
+                continue
+            rows.append({
+                'title': entry['title'],
+                'content': '',
+                'file_path': entry['file_path'],
+                'doc_type': entry['doc_type'],
+                'created_at': datetime.utcnow(),
+                'user_id': user.id,
+            })
+        if rows:
+            db.session.bulk_insert_mappings(Documentation, rows)
+            # Bulk inserts bypass the flush event that keeps facet counts fresh
+            bump_facet_generation(db.session.connection())
+            db.session.commit()
+            stats['imported'] += len(rows)
+        elapsed = time.perf_counter() - start
+        click.echo(f"Imported {stats['imported']} files ({stats['imported'] / elapsed:.0f} files/s)")
+    
+    archives = []
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            batch = []
+            for name, opener in iter_import_sources(source, archives):
+                basename = os.path.basename(name)
+                if basename.startswith('.') or '__MACOSX' in name:
+                    stats['hidden'] += 1
+                    continue
+                if not allowed_file(basename):
+                    stats['unsupported'] += 1
+                    continue
+                
+                ext = basename.rsplit('.', 1)[1].lower()
+                batch.append({
+                    'name': name,
+                    'opener': opener,
+                    'title': os.path.splitext(basename)[0][:200],
+                    'file_path': os.path.join(upload_folder, reserve_filename(name)),
+                    'doc_type': EXTENSION_DOC_TYPES[ext],
+                })
+                if len(batch) >= batch_size:
+                    flush(pool, batch)
+                    batch = []
+            if batch:
+                flush(pool, batch)
+    finally:
+        for archive in archives:
+            archive.close()
+    
+    elapsed = time.perf_counter() - start
+    megabytes = stats['bytes'] / (1024 * 1024)
+    click.echo("")
+    click.echo("Import finished")
+    click.echo(f"  Imported: {stats['imported']}")
+    click.echo(f"  Skipped:  {stats['unsupported']} (unsupported file type)")
+    click.echo(f"            {stats['hidden']} (hidden or __MACOSX files)")
+    click.echo(f"  Failed:   {stats['failed']}")
+    click.echo(f"  Data:     {megabytes:.1f} MB")
+    click.echo(f"  Elapsed:  {elapsed:.1f} s")
+    if elapsed > 0:
+        click.echo(f"  Rate:     {stats['imported'] / elapsed:.0f} files/s, {megabytes / elapsed:.1f} MB/s")
+
+@app.route('/export_catalog/<file_format>')
+def export_catalog(file_format):
+    """Download the document catalog with stats as a ZIP of CSV or Parquet files"""
+    if 'user_id' not in session:
+        return redirect(url_for('login'))
+    
+    if file_format not in EXPORT_FORMATS:
+        flash(f'Export format {file_format} is not supported', 'error')
+        return redirect(url_for('dashboard'))
+    
+    fd, zip_path = tempfile.mkstemp(suffix='.zip')
+    os.close(fd)
+    try:
+        write_catalog_export(zip_path, file_format)
+    except Exception as e:
+        os.remove(zip_path)
+        flash(f'Error exporting catalog: {str(e)}', 'error')
+        return redirect(url_for('dashboard'))
+    
+    response = send_file(
+        zip_path,
+        as_attachment=True,
+        download_name=f"catalog_{datetime.utcnow().strftime('%Y%m%d')}_{file_format}.zip",
+        mimetype='application/zip'
+    )
+    response.call_on_close(lambda: os.remove(zip_path))
+    return response
+
+@app.cli.command('export-catalog')
+@click.argument('output', type=click.Path(dir_okay=False, writable=True))
+@click.option('--format', 'file_format', type=click.Choice(sorted(EXPORT_FORMATS)), default='csv',
+              show_default=True, help='File format inside the ZIP archive.')
+def export_catalog_command(output, file_format):
+    """Export the document catalog and stats to a ZIP archive"""
+    start = time.perf_counter()
+    try:
+        total = write_catalog_export(output, file_format)
+    except RuntimeError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Exported {total} documents to {output} in {time.perf_counter() - start:.1f} s")
+
 def init_db():
     with app.app_context():
         db.create_all()
+        # create_all() only builds indexes for new tables, so add any that
+        # an older database is missing
+        for index in Documentation.__table__.indexes:
+            index.create(db.engine, checkfirst=True)
+        if db.session.get(FacetGeneration, 1) is None:
+            db.session.add(FacetGeneration(id=1, value=0))
         if not User.query.filter_by(username='admin').first():
             admin_user = User(
                 username='admin',
@@ -848,9 +1953,111 @@ def init_db():
             db.session.add(regular_user)
         
         db.session.commit()
+    
+    get_storage().ensure_ready()
+
+@app.cli.command('build-assets')
+def build_assets():
+    """Fingerprint and precompress the files in static/ for /assets/.
+
+    Files from earlier builds are kept (their names are unique), so pages that
+    still reference them keep working during and after a deploy.
+    """
+    static_folder = app.static_folder
+    folder = os.path.abspath(app.config['ASSET_FOLDER'])
+    os.makedirs(folder, exist_ok=True)
+    
+    def write_atomic(path, data):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    
+    manifest = {}
+    for root, dirs, files in os.walk(static_folder):
+        if os.path.abspath(root).startswith(folder):
+            continue
+        for name in files:
+            source = os.path.join(root, name)
+            rel_path = os.path.relpath(source, static_folder).replace(os.sep, '/')
+            with open(source, 'rb') as f:
+                data = f.read()
+            
+            stem, ext = os.path.splitext(rel_path)
+            digest = hashlib.sha256(data).hexdigest()[:12]
+            fingerprinted = f"{stem}.{digest}{ext}"
+            target = os.path.join(folder, fingerprinted)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            # Compressed variants first, so the plain file (which makes the
+            # asset servable) only appears once they are complete
+            mimetype = mimetypes.guess_type(name)[0]
+            if mimetype in app.config['COMPRESS_MIMETYPES']:
+                write_atomic(target + '.gz', gzip.compress(data, compresslevel=9))
+                if brotli is not None:
+                    write_atomic(target + '.br', brotli.compress(data, quality=11))
+            write_atomic(target, data)
+            
+            manifest[rel_path] = fingerprinted
+            click.echo(f"{rel_path} -> {fingerprinted}")
+    
+    # Swap the manifest in one step; running workers reload it on their next request
+    write_atomic(os.path.join(folder, 'manifest.json'),
+                 json.dumps(manifest, indent=2, sort_keys=True).encode('utf-8'))
+    click.echo(f"Built {len(manifest)} assets into {app.config['ASSET_FOLDER']}")
+
+@app.cli.command('serve')
+@click.option('--bind', default='0.0.0.0:8000', show_default=True, help='Address to listen on.')
+@click.option('--workers', default=(os.cpu_count() or 1) * 2 + 1, show_default=True, help='Number of worker processes.')
+@click.option('--threads', default=4, show_default=True, help='Threads per worker process.')
+@click.option('--max-requests', default=1000, show_default=True,
+              help='Recycle a worker after this many requests (0 disables).')
+@click.option('--max-requests-jitter', default=100, show_default=True,
+              help='Random extra requests before recycling, so workers do not restart together.')
+@click.option('--timeout', default=120, show_default=True, help='Seconds before a silent worker is killed.')
+@click.option('--graceful-timeout', default=30, show_default=True,
+              help='Seconds workers get to finish in-flight requests on shutdown.')
+def serve(bind, workers, threads, max_requests, max_requests_jitter, timeout, graceful_timeout):
+    """Run the production server (multi-process gunicorn)"""
+    if BaseApplication is None:
+        raise click.ClickException("gunicorn is not installed. Install it with: pip install gunicorn")
+    
+    # Set up the database and storage once in the master instead of in every worker
+    init_db()
+    # Workers must not share the master's database connections after fork
+    db.engine.dispose()
+    
+    def worker_exit(server, worker):
+        # Write queued activity log entries before the worker goes away
+        activity_writer.flush()
+    
+    class Server(BaseApplication):
+        def load_config(self):
+            options = {
+                'bind': bind,
+                'workers': workers,
+                'threads': threads,
+                'worker_class': 'gthread' if threads > 1 else 'sync',
+                'max_requests': max_requests,
+                'max_requests_jitter': max_requests_jitter,
+                'timeout': timeout,
+                'graceful_timeout': graceful_timeout,
+                # Import app.py (and the converter libraries) once in the master
+                # so forked workers share those pages
+                'preload_app': True,
+                'worker_exit': worker_exit,
+            }
+            for key, value in options.items():
+                self.cfg.set(key, value)
+        
+        def load(self):
+            return app
+    
+    Server().run()
 
 if __name__ == '__main__':
+    # Development server only; use `flask --app app serve` in production
     if not os.path.exists('uploads'):
         os.makedirs('uploads')
     init_db()
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=os.environ.get('FLASK_DEBUG', '1') == '1')
\ No newline at end of file
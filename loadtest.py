@@ -0,0 +1,482 @@
+"""Load-testing harness for the documentation app.
+
+Seeds the database and uploads/ with a synthetic corpus, starts the app on a
+local port (or targets an already running one with --url) and runs scripted
+user sessions at a fixed concurrency:
+
+    login -> dashboard -> view_doc -> download_file -> convert_doc (pdf, excel,
+    word) -> add_doc (occasionally)
+
+Results (throughput, p50/p95/p99 latency and error rate per route) are written
+as JSON so runs can be compared.
+
+By default the harness uses its own database (loadtest.db) and upload folder
+(loadtest_uploads/) so the real data is never touched; --cleanup removes the
+load-test users and their documents afterwards.
+
+Usage:
+    python loadtest.py --docs 500 --concurrency 20 --duration 60 --output run.json
+"""
+import argparse
+import http.cookiejar
+import io
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from datetime import datetime
+
+LOADTEST_USER_PREFIX = 'loadtest'
+LOADTEST_PASSWORD = 'loadtest123'
+CONVERT_FORMATS = ('pdf', 'excel', 'word')
+
+
+def make_pdf(title):
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter
+    buffer = io.BytesIO()
+    p = canvas.Canvas(buffer, pagesize=letter)
+    for page in range(3):
+        p.setFont("Helvetica-Bold", 16)
+        p.drawString(72, 720, f"{title} - page {page + 1}")
+        p.setFont("Helvetica", 11)
+        for line in range(40):
+            p.drawString(72, 690 - line * 15, f"Agenda item {line + 1}: kegiatan {title} {random.random():.6f}")
+        p.showPage()
+    p.save()
+    return buffer.getvalue()
+
+
+def make_excel(title):
+    import openpyxl
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(['No', 'Kegiatan', 'Lokasi', 'Peserta'])
+    for row in range(200):
+        sheet.append([row + 1, f"{title} {row}", f"Lokasi {random.randint(1, 50)}", random.randint(5, 500)])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def make_word(title):
+    from docx import Document
+    doc = Document()
+    doc.add_heading(title, 0)
+    for paragraph in range(50):
+        doc.add_paragraph(f"Paragraf {paragraph + 1} untuk {title}: {random.random():.6f}")
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def make_image(title):
+    from PIL import Image, ImageDraw
+    color = tuple(random.randint(0, 255) for _ in range(3))
+    img = Image.new('RGB', (1600, 1200), color)
+    draw = ImageDraw.Draw(img)
+    for _ in range(30):
+        x, y = random.randint(0, 1500), random.randint(0, 1100)
+        draw.rectangle([x, y, x + 100, y + 100], fill=tuple(random.randint(0, 255) for _ in range(3)))
+    draw.text((50, 50), title, fill=(255, 255, 255))
+    buffer = io.BytesIO()
+    img.save(buffer, format='JPEG', quality=90)
+    return buffer.getvalue()
+
+
+# doc_type -> (file extension, generator)
+CORPUS_TYPES = {
+    'pdf': ('pdf', make_pdf),
+    'excel': ('xlsx', make_excel),
+    'word': ('docx', make_word),
+    'image': ('jpg', make_image),
+}
+
+
+def seed(num_docs, num_users):
+    """Create load-test users and a mixed corpus of num_docs documents"""
+    from werkzeug.security import generate_password_hash
+    from app import app, db, User, Documentation, init_db, bump_facet_generation, get_storage
+
+    init_db()
+    with app.app_context():
+        users = []
+        for i in range(num_users):
+            username = f"{LOADTEST_USER_PREFIX}{i}"
+            user = User.query.filter_by(username=username).first()
+            if user is None:
+                user = User(username=username, password=generate_password_hash(LOADTEST_PASSWORD), role='user')
+                db.session.add(user)
+            users.append(user)
+        db.session.commit()
+
+        storage = get_storage()
+        upload_folder = app.config['UPLOAD_FOLDER']
+        doc_types = list(CORPUS_TYPES) + ['manual']
+        rows = []
+        for i in range(num_docs):
+            doc_type = doc_types[i % len(doc_types)]
+            title = f"Loadtest {doc_type} {i}"
+            row = {
+                'title': title,
+                'content': '',
+                'file_path': None,
+                'doc_type': doc_type,
+                'created_at': datetime.utcnow(),
+                'user_id': random.choice(users).id,
+            }
+            if doc_type == 'manual':
+                row['content'] = '\n'.join(f"Catatan {line} untuk {title}" for line in range(30))
+            else:
+                ext, generate = CORPUS_TYPES[doc_type]
+                file_path = os.path.join(upload_folder, f"loadtest_{uuid.uuid4().hex}.{ext}")
+                storage.save(file_path, io.BytesIO(generate(title)))
+                row['file_path'] = file_path
+            rows.append(row)
+            if len(rows) >= 500:
+                db.session.bulk_insert_mappings(Documentation, rows)
+                bump_facet_generation(db.session.connection())
+                db.session.commit()
+                rows = []
+        if rows:
+            db.session.bulk_insert_mappings(Documentation, rows)
+            bump_facet_generation(db.session.connection())
+            db.session.commit()
+        if num_docs:
+            print(f"Seeded {num_docs} documents and {num_users} users", file=sys.stderr)
+
+
+def cleanup():
+    """Delete the load-test users together with their documents and files"""
+    from app import app, db, User, Documentation, delete_stored_file
+    with app.app_context():
+        users = User.query.filter(User.username.like(f"{LOADTEST_USER_PREFIX}%")).all()
+        user_ids = [user.id for user in users]
+        docs = Documentation.query.filter(Documentation.user_id.in_(user_ids)).all() if user_ids else []
+        for doc in docs:
+            if doc.file_path:
+                delete_stored_file(doc.file_path)
+            db.session.delete(doc)
+        for user in users:
+            db.session.delete(user)
+        db.session.commit()
+        print(f"Removed {len(docs)} documents and {len(users)} load-test users", file=sys.stderr)
+
+
+def load_targets():
+    """Return [(doc_id, doc_type, has_file)] for every document in the database"""
+    from app import app, db, Documentation
+    with app.app_context():
+        rows = db.session.query(Documentation.id, Documentation.doc_type, Documentation.file_path).all()
+        return [(doc_id, doc_type, bool(file_path)) for doc_id, doc_type, file_path in rows]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(mode, port, workers, threads):
+    """Start the app on a local port and wait until it answers"""
+    if mode == 'serve':
+        command = [sys.executable, '-m', 'flask', '--app', 'app', 'serve',
+                   '--bind', f'127.0.0.1:{port}', '--workers', str(workers), '--threads', str(threads)]
+    else:
+        command = [sys.executable, '-m', 'flask', '--app', 'app', 'run',
+                   '--port', str(port), '--no-reload', '--no-debugger', '--with-threads']
+    process = subprocess.Popen(command, cwd=os.path.dirname(os.path.abspath(__file__)))
+    url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"Server exited with code {process.returncode}")
+        try:
+            urllib.request.urlopen(f'{url}/login', timeout=2).close()
+            return process, url
+        except (urllib.error.URLError, ConnectionError, socket.timeout):
+            time.sleep(0.5)
+    process.terminate()
+    raise SystemExit("Server did not start within 60 seconds")
+
+
+class NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Report redirects as responses so each route is timed on its own"""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+def is_presigned_url(location):
+    """Whether a redirect points at a presigned storage URL (STORAGE_BACKEND=s3)"""
+    parsed = urllib.parse.urlparse(location)
+    endpoint = os.environ.get('S3_ENDPOINT_URL')
+    if endpoint:
+        return parsed.netloc == urllib.parse.urlparse(endpoint).netloc
+    return 'X-Amz-Signature=' in parsed.query
+
+
+def encode_multipart(fields, files):
+    boundary = uuid.uuid4().hex
+    body = io.BytesIO()
+    for name, value in fields.items():
+        body.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+    for name, (filename, data, content_type) in files.items():
+        body.write(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; '
+                   f'filename="{filename}"\r\nContent-Type: {content_type}\r\n\r\n'.encode())
+        body.write(data)
+        body.write(b'\r\n')
+    body.write(f'--{boundary}--\r\n'.encode())
+    return body.getvalue(), f'multipart/form-data; boundary={boundary}'
+
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+
+    def record(self, route, elapsed, ok):
+        with self.lock:
+            self.latencies.setdefault(route, []).append(elapsed)
+            self.errors.setdefault(route, 0)
+            if not ok:
+                self.errors[route] += 1
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    # Nearest-rank percentile
+    rank = math.ceil(pct / 100 * len(sorted_values))
+    return sorted_values[max(rank, 1) - 1]
+
+
+class VirtualUser:
+    """One scripted browser session"""
+
+    def __init__(self, base_url, username, targets, metrics, upload_ratio):
+        self.base_url = base_url
+        self.username = username
+        self.targets = targets
+        self.metrics = metrics
+        self.upload_ratio = upload_ratio
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), NoRedirect()
+        )
+        # Presigned storage URLs are fetched without the app's session cookie
+        self.storage_opener = urllib.request.build_opener(NoRedirect())
+
+    def fetch(self, opener, url, data=None, content_type=None):
+        """Return (status, Location header, seconds taken) for one request"""
+        req = urllib.request.Request(url, data=data)
+        req.add_header('Accept-Encoding', 'gzip')
+        if content_type:
+            req.add_header('Content-Type', content_type)
+        start = time.perf_counter()
+        try:
+            with opener.open(req, timeout=120) as response:
+                response.read()
+                status, location = response.status, response.headers.get('Location', '')
+        except urllib.error.HTTPError as e:
+            e.read()
+            status, location = e.code, e.headers.get('Location', '')
+        except (urllib.error.URLError, ConnectionError, socket.timeout):
+            status, location = None, ''
+        return status, location, time.perf_counter() - start
+
+    def request(self, route, path, data=None, content_type=None, expect=200, expect_location=None,
+                file_download=False):
+        """Time one app route.
+
+        file_download marks routes that send the stored file itself: with S3
+        storage they redirect to a presigned URL, which is then followed and
+        timed separately as '<route>:storage'.
+        """
+        status, location, elapsed = self.fetch(self.opener, self.base_url + path, data, content_type)
+        if file_download and status == 302 and is_presigned_url(location):
+            self.metrics.record(route, elapsed, True)
+            status, location, elapsed = self.fetch(self.storage_opener, location)
+            ok = status == 200
+            self.metrics.record(f'{route}:storage', elapsed, ok)
+            return ok
+        ok = status == expect and (expect_location is None or expect_location in location)
+        self.metrics.record(route, elapsed, ok)
+        return ok
+
+    def login(self):
+        data = urllib.parse.urlencode({'username': self.username, 'password': LOADTEST_PASSWORD}).encode()
+        return self.request('login', '/login', data=data, content_type='application/x-www-form-urlencoded',
+                            expect=302, expect_location='/dashboard')
+
+    def iteration(self):
+        self.request('dashboard', '/dashboard')
+        doc_id, doc_type, has_file = random.choice(self.targets)
+        self.request('view_doc', f'/view_doc/{doc_id}')
+        if has_file:
+            self.request('download_file', f'/download_file/{doc_id}', file_download=True)
+        for target_format in CONVERT_FORMATS:
+            # Converting to the document's own format sends the original file
+            self.request(f'convert_doc:{doc_type}->{target_format}', f'/convert_doc/{doc_id}/{target_format}',
+                         file_download=doc_type == target_format)
+        if random.random() < self.upload_ratio:
+            title = f"Loadtest upload {uuid.uuid4().hex[:8]}"
+            body, content_type = encode_multipart(
+                {'title': title, 'doc_type': 'pdf', 'content': ''},
+                {'file': (f"loadtest_{uuid.uuid4().hex}.pdf", make_pdf(title), 'application/pdf')}
+            )
+            self.request('add_doc', '/add_doc', data=body, content_type=content_type,
+                         expect=302, expect_location='/dashboard')
+
+    def run(self, stop_at):
+        while time.monotonic() < stop_at:
+            if self.login():
+                break
+            time.sleep(1)
+        while time.monotonic() < stop_at:
+            self.iteration()
+
+
+def build_report(metrics, elapsed, config):
+    routes = {}
+    total_requests = 0
+    total_errors = 0
+    for route in sorted(metrics.latencies):
+        values = sorted(metrics.latencies[route])
+        errors = metrics.errors[route]
+        total_requests += len(values)
+        total_errors += errors
+        routes[route] = {
+            'requests': len(values),
+            'errors': errors,
+            'error_rate': errors / len(values),
+            'throughput_rps': len(values) / elapsed,
+            'mean_ms': sum(values) / len(values) * 1000,
+            'p50_ms': percentile(values, 50) * 1000,
+            'p95_ms': percentile(values, 95) * 1000,
+            'p99_ms': percentile(values, 99) * 1000,
+            'max_ms': values[-1] * 1000,
+        }
+    return {
+        'started_at': config.pop('started_at'),
+        'config': config,
+        'duration_s': elapsed,
+        'totals': {
+            'requests': total_requests,
+            'errors': total_errors,
+            'error_rate': total_errors / total_requests if total_requests else 0,
+            'throughput_rps': total_requests / elapsed,
+        },
+        'routes': routes,
+    }
+
+
+def print_summary(report):
+    print(f"{'route':<32} {'reqs':>7} {'err%':>6} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}", file=sys.stderr)
+    for route, stats in report['routes'].items():
+        print(f"{route:<32} {stats['requests']:>7} {stats['error_rate'] * 100:>5.1f}% "
+              f"{stats['throughput_rps']:>8.1f} {stats['p50_ms']:>6.0f}ms {stats['p95_ms']:>6.0f}ms "
+              f"{stats['p99_ms']:>6.0f}ms", file=sys.stderr)
+    totals = report['totals']
+    print(f"Total: {totals['requests']} requests, {totals['throughput_rps']:.1f} req/s, "
+          f"{totals['error_rate'] * 100:.2f}% errors", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--docs', type=int, default=200, help='Documents to seed (0 to reuse the existing corpus)')
+    parser.add_argument('--users', type=int, default=10, help='Load-test user accounts to create (at least 1)')
+    parser.add_argument('--concurrency', type=int, default=10, help='Concurrent virtual users')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run the scenarios')
+    parser.add_argument('--upload-ratio', type=float, default=0.1,
+                        help='Probability that an iteration also uploads a document')
+    parser.add_argument('--url', help='Target an already running server instead of starting one '
+                                      '(must use the same --database-uri and --upload-folder)')
+    parser.add_argument('--database-uri', default=os.environ.get('DATABASE_URL', 'sqlite:///loadtest.db'),
+                        help='Database to seed and test against (default: $DATABASE_URL or sqlite:///loadtest.db)')
+    parser.add_argument('--upload-folder', default=os.environ.get('UPLOAD_FOLDER', 'loadtest_uploads'),
+                        help='Upload folder / storage prefix (default: $UPLOAD_FOLDER or loadtest_uploads)')
+    parser.add_argument('--cleanup', action='store_true',
+                        help='Delete the load-test users, their documents and files after the run')
+    parser.add_argument('--server', choices=('serve', 'dev'), default='serve',
+                        help="Server to start: 'serve' (gunicorn) or 'dev' (threaded Werkzeug)")
+    parser.add_argument('--workers', type=int, default=4, help='Worker processes for --server serve')
+    parser.add_argument('--threads', type=int, default=4, help='Threads per worker for --server serve')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible runs')
+    parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+    args = parser.parse_args()
+    if args.users < 1:
+        parser.error('--users must be at least 1')
+
+    # app.py reads these when it is imported, and the server subprocess inherits them
+    os.environ['DATABASE_URL'] = args.database_uri
+    os.environ['UPLOAD_FOLDER'] = args.upload_folder
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    seed(args.docs, args.users)
+    targets = load_targets()
+    if not targets:
+        raise SystemExit("No documents to test against; seed some with --docs")
+
+    process = None
+    url = args.url
+    if url is None:
+        process, url = start_server(args.server, free_port(), args.workers, args.threads)
+
+    config = {
+        'started_at': datetime.utcnow().isoformat(),
+        'url': url,
+        'server': 'external' if args.url else args.server,
+        'workers': args.workers,
+        'threads': args.threads,
+        'concurrency': args.concurrency,
+        'duration_s': args.duration,
+        'upload_ratio': args.upload_ratio,
+        'database_uri': args.database_uri,
+        'documents': len(targets),
+        'seed': args.seed,
+    }
+    metrics = Metrics()
+    try:
+        start = time.monotonic()
+        stop_at = start + args.duration
+        threads = []
+        for i in range(args.concurrency):
+            user = VirtualUser(url, f"{LOADTEST_USER_PREFIX}{i % args.users}", targets, metrics,
+                               args.upload_ratio)
+            thread = threading.Thread(target=user.run, args=(stop_at,), daemon=True)
+            thread.start()
+            threads.append(thread)
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - start
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=60)
+        if args.cleanup:
+            cleanup()
+
+    report = build_report(metrics, elapsed, config)
+    print_summary(report)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()